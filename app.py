@@ -3,32 +3,86 @@ import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import os
+import threading
 from utils.data_storage import StockDataStorage
-from utils.config import load_config
+from utils.config import load_config, get_env_mtime
 from utils.logger import setup_logger
-from stock_monitor import main as run_stock_monitor
+from stock_monitor import main as run_stock_monitor, refresh_event
 
 # Setup logging
 logger = setup_logger('StreamlitApp')
 
+# Seconds between re-renders of the symbol block while the page is open
+SYMBOL_REFRESH_INTERVAL = 10
+
 # Initialize data storage
 @st.cache_resource
 def get_data_storage():
     return StockDataStorage()
 
+# Run the stock monitor loop in the background so updates can be requested
+# without blocking the UI
+@st.cache_resource
+def start_stock_monitor():
+    monitor = threading.Thread(target=run_stock_monitor, name='StockMonitor', daemon=True)
+    monitor.start()
+    return monitor
+
 # Load configuration
 @st.cache_data
-def load_stock_config():
-    return load_config()
+def load_stock_config(env_mtime: int):
+    return load_config(env_mtime)
+
+# Cached reads are invalidated as soon as the database files change
+@st.cache_data(ttl=30)
+def load_latest_data(storage_mtime: int):
+    return get_data_storage().get_latest_data()
+
+@st.cache_data(ttl=30)
+def load_price_alerts(storage_mtime: int):
+    data_storage = get_data_storage()
+    latest_data = load_latest_data(storage_mtime)
+    if latest_data is None:
+        return None
+    comparison_data = data_storage.compare_with_previous(latest_data)
+    if comparison_data is None:
+        return None
+    return data_storage.analyze_price_changes(comparison_data)
+
+# Days of daily summaries shown in the price chart
+PRICE_HISTORY_DAYS = 30
 
-def create_price_chart(df, symbol):
-    """Create a candlestick chart for a stock"""
+@st.cache_data(ttl=30)
+def load_price_history(storage_mtime: int, symbol: str):
+    """Collect a symbol's daily summaries over the last PRICE_HISTORY_DAYS days"""
+    data_storage = get_data_storage()
+    today = datetime.now()
+    days = []
+    for offset in range(PRICE_HISTORY_DAYS - 1, -1, -1):
+        date = today - timedelta(days=offset)
+        summary = data_storage.get_daily_summary(date=date, symbol=symbol)
+        if summary is not None and not summary.empty:
+            days.append(summary.assign(Date=date.date()))
+    if not days:
+        return None
+    return pd.concat(days, ignore_index=True)
+
+@st.cache_data(ttl=30)
+def create_price_chart(storage_mtime: int, _df: pd.DataFrame, symbol: str):
+    """
+    Create a candlestick chart for a stock
+    
+    The history is read from storage, so the chart is cached on the storage
+    mtime it was read at rather than on the DataFrame itself, which is
+    excluded from Streamlit's argument hashing.
+    """
+    df = _df
     fig = go.Figure(data=[go.Candlestick(
-        x=df['date'],
-        open=df['opening_price'],
-        high=df['high_price'],
-        low=df['low_price'],
-        close=df['closing_price']
+        x=df['Date'],
+        open=df['Opening Price'],
+        high=df['High Price'],
+        low=df['Low Price'],
+        close=df['Closing Price']
     )])
     
     fig.update_layout(
@@ -43,12 +97,92 @@ def create_price_chart(df, symbol):
 def trigger_stock_update():
     """Trigger a stock data update"""
     try:
-        run_stock_monitor(one_time=True)
-        st.success("Stock data updated successfully!")
+        monitor = start_stock_monitor()
+        if refresh_event.set():
+            st.success("Stock data update requested!")
+        elif monitor.is_alive():
+            # The background monitor has not bound the trigger yet; its first
+            # pass fetches straight away
+            st.info("Stock monitor is starting, data will update shortly")
+        else:
+            # The background monitor is not running, update inline instead
+            run_stock_monitor(one_time=True)
+            st.success("Stock data updated successfully!")
     except Exception as e:
         st.error(f"Error updating stock data: {str(e)}")
         logger.error(f"Failed to trigger stock update: {str(e)}")
 
+@st.fragment(run_every=SYMBOL_REFRESH_INTERVAL)
+def render_last_update():
+    """Show the time of the latest snapshot, refreshed with the symbol block"""
+    latest_data = load_latest_data(get_data_storage().latest_mtime)
+    if latest_data is not None and not latest_data.empty:
+        try:
+            last_update = pd.to_datetime(latest_data['timestamp'].iloc[0])
+            st.write(f"Last Update: {last_update.strftime('%Y-%m-%d %H:%M:%S')}")
+        except (KeyError, IndexError) as e:
+            logger.warning(f"Could not get last update time: {str(e)}")
+            st.write("Last Update: Not available")
+
+# Only the price and alerts block is re-run on its own schedule to pick up
+# new snapshots, without re-executing the whole script
+@st.fragment(run_every=SYMBOL_REFRESH_INTERVAL)
+def render_symbol(selected_symbol: str):
+    """Render the current price, chart and alerts for a symbol"""
+    # Re-read the latest snapshot so fragment reruns pick up new data
+    data_storage = get_data_storage()
+    storage_mtime = data_storage.latest_mtime
+    latest_data = load_latest_data(storage_mtime)
+    latest_by_sym = latest_data.set_index('Symbol') if latest_data is not None else None
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.subheader("Current Market Status")
+        
+        # Get latest data
+        if latest_by_sym is not None and selected_symbol in latest_by_sym.index:
+            # Filter for selected symbol
+            symbol_data = latest_by_sym.loc[[selected_symbol]]
+            if not symbol_data.empty:
+                # Display current price and changes
+                row = symbol_data.iloc[0]
+                st.metric(
+                    label=f"{selected_symbol} Current Price",
+                    value=f"${row['Current Price']:.2f}",
+                    delta=f"{row['Daily Change']:.2f}%"
+                )
+                
+                # Get historical data for chart
+                historical_data = load_price_history(storage_mtime, selected_symbol)
+                if historical_data is not None:
+                    history_by_sym = historical_data.set_index('Symbol')
+                    if selected_symbol in history_by_sym.index:
+                        symbol_history = history_by_sym.loc[[selected_symbol]]
+                        st.plotly_chart(
+                            create_price_chart(storage_mtime, symbol_history, selected_symbol),
+                            use_container_width=True
+                        )
+    
+    with col2:
+        st.subheader("Price Alerts")
+        
+        # Get comparison data
+        alerts = load_price_alerts(storage_mtime)
+        if alerts:
+            # Display significant changes
+            if alerts['significant_changes']:
+                st.write("Significant Price Changes:")
+                for change in alerts['significant_changes']:
+                    if change['symbol'] == selected_symbol:
+                        direction = "↑" if change['direction'] == 'increase' else "↓"
+                        st.write(
+                            f"{direction} {change['symbol']}: "
+                            f"${change['previous_price']:.2f} → "
+                            f"${change['current_price']:.2f} "
+                            f"({change['change_pct']:.2f}%)"
+                        )
+
 def main():
     st.set_page_config(
         page_title="Stock Market Monitor",
@@ -60,9 +194,10 @@ def main():
     
     # Initialize data storage
     data_storage = get_data_storage()
+    start_stock_monitor()
     
     # Load configuration
-    config = load_stock_config()
+    config = load_stock_config(get_env_mtime())
     symbols = config.get('symbols', [])
     
     # Sidebar
@@ -71,17 +206,16 @@ def main():
     # Add update trigger button
     if st.sidebar.button("🔄 Update Stock Data"):
         trigger_stock_update()
-        st.rerun()
     
     # Show last update time
-    latest_data = data_storage.get_latest_data()
-    if latest_data is not None and not latest_data.empty:
-        try:
-            last_update = pd.to_datetime(latest_data['timestamp'].iloc[0])
-            st.sidebar.write(f"Last Update: {last_update.strftime('%Y-%m-%d %H:%M:%S')}")
-        except (KeyError, IndexError) as e:
-            logger.warning(f"Could not get last update time: {str(e)}")
-            st.sidebar.write("Last Update: Not available")
+    with st.sidebar:
+        render_last_update()
+    
+    storage_mtime = data_storage.latest_mtime
+    latest_data = load_latest_data(storage_mtime)
+    
+    # Index by symbol once so per-symbol lookups below are hash probes
+    latest_by_sym = latest_data.set_index('Symbol') if latest_data is not None else None
     
     selected_symbol = st.sidebar.selectbox(
         "Select Stock Symbol",
@@ -90,65 +224,14 @@ def main():
     )
     
     # Main content
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.subheader("Current Market Status")
-        
-        # Get latest data
-        if latest_data is not None:
-            # Filter for selected symbol
-            symbol_data = latest_data[latest_data['Symbol'] == selected_symbol]
-            if not symbol_data.empty:
-                # Display current price and changes
-                current_price = float(symbol_data['Current Price'].iloc[0].replace('$', ''))
-                daily_change = float(symbol_data['Daily Change'].iloc[0].replace('%', ''))
-                
-                st.metric(
-                    label=f"{selected_symbol} Current Price",
-                    value=f"${current_price:.2f}",
-                    delta=f"{daily_change:.2f}%"
-                )
-                
-                # Get historical data for chart
-                historical_data = data_storage.get_daily_summary(
-                    date=datetime.now() - timedelta(days=30)
-                )
-                if historical_data is not None:
-                    symbol_history = historical_data[historical_data['Symbol'] == selected_symbol]
-                    if not symbol_history.empty:
-                        st.plotly_chart(
-                            create_price_chart(symbol_history, selected_symbol),
-                            use_container_width=True
-                        )
-    
-    with col2:
-        st.subheader("Price Alerts")
-        
-        # Get comparison data
-        if latest_data is not None:
-            comparison_data = data_storage.compare_with_previous(latest_data)
-            if comparison_data is not None:
-                alerts = data_storage.analyze_price_changes(comparison_data)
-                if alerts:
-                    # Display significant changes
-                    if alerts['significant_changes']:
-                        st.write("Significant Price Changes:")
-                        for change in alerts['significant_changes']:
-                            if change['symbol'] == selected_symbol:
-                                direction = "↑" if change['direction'] == 'increase' else "↓"
-                                st.write(
-                                    f"{direction} {change['symbol']}: "
-                                    f"${change['previous_price']:.2f} → "
-                                    f"${change['current_price']:.2f} "
-                                    f"({change['change_pct']:.2f}%)"
-                                )
+    render_symbol(selected_symbol)
     
     # Daily Summary
     st.subheader("Daily Summary")
-    daily_summary = data_storage.get_daily_summary()
-    if daily_summary is not None:
-        symbol_summary = daily_summary[daily_summary['Symbol'] == selected_symbol]
+    daily_summary = data_storage.get_daily_summary(symbol=selected_symbol, formatted=True)
+    summary_by_sym = daily_summary.set_index('Symbol') if daily_summary is not None else None
+    if summary_by_sym is not None and selected_symbol in summary_by_sym.index:
+        symbol_summary = summary_by_sym.loc[[selected_symbol]]
         if not symbol_summary.empty:
             col3, col4, col5 = st.columns(3)
             
@@ -170,8 +253,8 @@ def main():
     
     # Data Sources
     st.sidebar.subheader("Data Sources")
-    if latest_data is not None:
-        symbol_data = latest_data[latest_data['Symbol'] == selected_symbol]
+    if latest_by_sym is not None and selected_symbol in latest_by_sym.index:
+        symbol_data = latest_by_sym.loc[[selected_symbol]]
         if not symbol_data.empty:
             st.sidebar.write(f"Sources: {symbol_data['Sources'].iloc[0]}")
 
@@ -1,32 +1,96 @@
 from alpha_vantage.timeseries import TimeSeries
+from alpha_vantage.async_support.timeseries import TimeSeries as AsyncTimeSeries
+from collections import OrderedDict
 from typing import Dict, Optional
+import threading
+import time
 from .base_client import StockDataClient
 
+# Quotes are reused within the same minute to spare the free-tier quota
+QUOTE_CACHE_SIZE = 512
+QUOTE_CACHE_BUCKET = 60
+
+# Shared by every client instance, keyed by (symbol, minute bucket). Pool
+# threads fetch concurrently, so all access goes through the lock.
+_quote_cache = OrderedDict()
+_quote_cache_lock = threading.Lock()
+
 class AlphaVantageClient(StockDataClient):
     """Client for fetching stock data from Alpha Vantage"""
-    
+
     def __init__(self, api_key: str):
         super().__init__()
         self.api_key = api_key
         self.ts = TimeSeries(key=api_key, output_format='pandas')
+        self._async_ts = None
         self.logger.info("Initialized Alpha Vantage client")
-    
+
     def get_stock_data(self, symbol: str) -> Optional[Dict]:
+        key = self._cache_key(symbol)
+        cached = self._cached_quote(key)
+        if cached is not None:
+            return cached
         try:
             self.logger.info(f"Fetching data for {symbol} from Alpha Vantage")
             data, meta_data = self.ts.get_quote_endpoint(symbol)
-            if not data.empty:
-                result = {
-                    'price': float(data['05. price'].iloc[0]),
-                    'prev_close': float(data['08. previous close'].iloc[0]),
-                    'company_name': meta_data.get('2. Symbol', 'N/A')
-                }
-                self.logger.info(f"Successfully fetched data for {symbol}")
-                return result
-            self.logger.warning(f"No data returned for {symbol}")
+            return self._cache_quote(key, self._parse_quote(symbol, data, meta_data))
         except Exception as e:
             self.logger.error(f"Error fetching Alpha Vantage data for {symbol}: {str(e)}")
         return None
-    
+
+    async def get_stock_data_async(self, symbol: str) -> Optional[Dict]:
+        key = self._cache_key(symbol)
+        cached = self._cached_quote(key)
+        if cached is not None:
+            return cached
+        try:
+            self.logger.info(f"Fetching data for {symbol} from Alpha Vantage")
+            if self._async_ts is None:
+                self._async_ts = AsyncTimeSeries(key=self.api_key, output_format='pandas')
+            data, meta_data = await self._async_ts.get_quote_endpoint(symbol)
+            return self._cache_quote(key, self._parse_quote(symbol, data, meta_data))
+        except Exception as e:
+            self.logger.error(f"Error fetching Alpha Vantage data for {symbol}: {str(e)}")
+        return None
+
+    def _cache_key(self, symbol: str):
+        return symbol, int(time.time() // QUOTE_CACHE_BUCKET)
+
+    def _cached_quote(self, key) -> Optional[Dict]:
+        with _quote_cache_lock:
+            quote = _quote_cache.get(key)
+            if quote is None:
+                return None
+            _quote_cache.move_to_end(key)
+        self.logger.info(f"Using cached Alpha Vantage data for {key[0]}")
+        return quote
+
+    def _cache_quote(self, key, quote: Optional[Dict]) -> Optional[Dict]:
+        if quote is not None:
+            with _quote_cache_lock:
+                _quote_cache[key] = quote
+                if len(_quote_cache) > QUOTE_CACHE_SIZE:
+                    _quote_cache.popitem(last=False)
+        return quote
+
+    def _parse_quote(self, symbol: str, data, meta_data) -> Optional[Dict]:
+        # The quote doubles as symbol validation: unknown symbols come back
+        # as an empty quote without a price
+        if not data.empty and '05. price' in data and data['05. price'].iloc[0] not in (None, ''):
+            result = {
+                'price': float(data['05. price'].iloc[0]),
+                'prev_close': float(data['08. previous close'].iloc[0]),
+                'company_name': (meta_data or {}).get('2. Symbol', 'N/A')
+            }
+            self.logger.info(f"Successfully fetched data for {symbol}")
+            return result
+        self.logger.warning(f"No data returned for {symbol}")
+        return None
+
+    async def aclose(self):
+        if self._async_ts is not None:
+            await self._async_ts.close()
+            self._async_ts = None
+
     def get_source_name(self) -> str:
-        return "Alpha Vantage" 
\ No newline at end of file
+        return "Alpha Vantage"
\ No newline at end of file
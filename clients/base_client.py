@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
+import asyncio
 import logging
 from utils.logger import setup_logger
 
@@ -28,6 +29,25 @@ class StockDataClient(ABC):
         """
         pass
     
+    async def get_stock_data_async(self, symbol: str) -> Optional[Dict]:
+        """
+        Get stock data for a given symbol without blocking the event loop
+        
+        Clients with a native async transport should override this; the
+        default runs get_stock_data in a worker thread.
+        
+        Args:
+            symbol: Stock symbol to fetch data for
+            
+        Returns:
+            Same format as get_stock_data
+        """
+        return await asyncio.to_thread(self.get_stock_data, symbol)
+    
+    async def aclose(self):
+        """Release any resources held by the async transport"""
+        pass
+    
     @abstractmethod
     def get_source_name(self) -> str:
         """
@@ -1,25 +1,180 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import orjson
 import yfinance as yf
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+from yfinance.data import YfData
 from .base_client import StockDataClient
 
+QUOTE_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+REQUEST_TIMEOUT = 10.0
+
+# Quotes are served from memory for this many seconds so repeated
+# dashboard interactions do not hit Yahoo Finance again
+CACHE_DIR = 'data'
+CACHE_EXPIRE_AFTER = 60
+
+# symbol -> (fetched at, quote); shared by every client instance and the
+# worker threads of the async batch, so all access goes through the lock
+_quote_cache = {}
+_quote_cache_lock = threading.Lock()
+
+# Company names never change, so they are cached on disk indefinitely
+COMPANY_NAMES_FILE = os.path.join(CACHE_DIR, 'company_names.json')
+_company_names = None
+_company_names_lock = threading.Lock()
+
+def _cached_quotes(symbols: List[str]) -> Dict[str, Dict]:
+    """Get the quotes fetched within the last CACHE_EXPIRE_AFTER seconds"""
+    now = time.monotonic()
+    quotes = {}
+    with _quote_cache_lock:
+        for symbol in symbols:
+            entry = _quote_cache.get(symbol)
+            if entry is not None and now - entry[0] < CACHE_EXPIRE_AFTER:
+                quotes[symbol] = entry[1]
+    return quotes
+
+def _cache_quotes(quotes: Dict[str, Dict]):
+    now = time.monotonic()
+    with _quote_cache_lock:
+        for symbol, quote in quotes.items():
+            _quote_cache[symbol] = (now, quote)
+
+def _load_company_names() -> Dict[str, str]:
+    global _company_names
+    if _company_names is None:
+        try:
+            with open(COMPANY_NAMES_FILE, 'r', encoding='utf-8') as f:
+                _company_names = json.load(f)
+        except (OSError, ValueError):
+            _company_names = {}
+    return _company_names
+
+def _store_company_names(names: Dict[str, str]):
+    with _company_names_lock:
+        cached = _load_company_names()
+        new_names = {symbol: name for symbol, name in names.items() if cached.get(symbol) != name}
+        if not new_names:
+            return
+        cached.update(new_names)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(COMPANY_NAMES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cached, f)
+
 class YahooFinanceClient(StockDataClient):
     """Client for fetching stock data from Yahoo Finance"""
-    
+
     def get_stock_data(self, symbol: str) -> Optional[Dict]:
+        return self.get_stock_data_batch([symbol]).get(symbol)
+
+    async def get_stock_data_async(self, symbol: str) -> Optional[Dict]:
+        return (await self.get_stock_data_batch_async([symbol])).get(symbol)
+
+    def get_stock_data_batch(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get stock data for several symbols with a single quote request
+
+        Args:
+            symbols: Stock symbols to fetch data for
+
+        Returns:
+            Dictionary mapping each symbol found to its stock data, in the
+            format returned by get_stock_data. Symbols Yahoo Finance did not
+            return are missing from the result.
+        """
+        results = _cached_quotes(symbols)
+        if len(results) == len(symbols):
+            self.logger.info(f"Using cached Yahoo Finance data for {len(symbols)} symbols")
+            return results
+        to_fetch = [symbol for symbol in symbols if symbol not in results]
+
         try:
-            self.logger.info(f"Fetching data for {symbol} from Yahoo Finance")
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            data = {
-                'price': info.get('currentPrice', None),
-                'prev_close': info.get('previousClose', None),
-                'company_name': info.get('longName', 'N/A')
+            self.logger.info(f"Fetching data for {len(to_fetch)} symbols from Yahoo Finance")
+            # The quote endpoint rejects requests without Yahoo's cookie and
+            # crumb, so go through yfinance's shared session which manages both
+            response = YfData().get(
+                QUOTE_URL,
+                params={'symbols': ','.join(to_fetch)},
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            fetched = self._parse_quotes(to_fetch, orjson.loads(response.content))
+        except Exception as e:
+            self.logger.error(f"Error fetching Yahoo Finance data for {', '.join(to_fetch)}: {str(e)}")
+            fetched = {}
+
+        # Fall back to yfinance's lightweight quote summary for anything the
+        # batch did not return
+        missing = [symbol for symbol in to_fetch if symbol not in fetched]
+        if missing:
+            self.logger.warning(f"Batch quote incomplete, fetching {', '.join(missing)} one at a time")
+        for symbol in missing:
+            data = self._get_fast_info(symbol)
+            if data:
+                fetched[symbol] = data
+
+        _cache_quotes(fetched)
+        results.update(fetched)
+        return results
+
+    async def get_stock_data_batch_async(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Asynchronous variant of get_stock_data_batch"""
+        # Runs yfinance's blocking session off the event loop; the batch is a
+        # single request so nothing is lost by not using an async transport
+        return await asyncio.to_thread(self.get_stock_data_batch, symbols)
+
+    def _parse_quotes(self, symbols: List[str], payload: Dict) -> Dict[str, Dict]:
+        results = {}
+        for quote in payload.get('quoteResponse', {}).get('result') or []:
+            results[quote.get('symbol')] = {
+                'price': quote.get('regularMarketPrice', None),
+                'prev_close': quote.get('regularMarketPreviousClose', None),
+                'company_name': quote.get('longName', 'N/A')
+            }
+
+        missing = [symbol for symbol in symbols if symbol not in results]
+        if missing:
+            self.logger.warning(f"No data returned for {', '.join(missing)}")
+        self.logger.info(f"Successfully fetched data for {len(results)} symbols")
+        _store_company_names({
+            symbol: data['company_name']
+            for symbol, data in results.items()
+            if data['company_name'] != 'N/A'
+        })
+        return results
+
+    def _get_fast_info(self, symbol: str) -> Optional[Dict]:
+        try:
+            self.logger.info(f"Fetching quote summary for {symbol} from Yahoo Finance")
+            fast_info = yf.Ticker(symbol).fast_info
+            price, prev_close = fast_info['last_price'], fast_info['previous_close']
+            if price is None:
+                return None
+            return {
+                'price': price,
+                'prev_close': prev_close,
+                'company_name': self._get_company_name(symbol)
             }
-            self.logger.info(f"Successfully fetched data for {symbol}")
-            return data
         except Exception as e:
             self.logger.error(f"Error fetching Yahoo Finance data for {symbol}: {str(e)}")
             return None
-    
+
+    def _get_company_name(self, symbol: str) -> str:
+        """Get a company name, fetching it only the first time a symbol is seen"""
+        name = _load_company_names().get(symbol)
+        if name is None:
+            try:
+                name = yf.Ticker(symbol).info.get('longName', 'N/A')
+            except Exception as e:
+                self.logger.error(f"Error fetching company name for {symbol}: {str(e)}")
+                return 'N/A'
+            if name != 'N/A':
+                _store_company_names({symbol: name})
+        return name
+
     def get_source_name(self) -> str:
-        return "Yahoo Finance" 
\ No newline at end of file
+        return "Yahoo Finance"
\ No newline at end of file
@@ -1,48 +1,110 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
+import asyncio
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from clients import YahooFinanceClient, AlphaVantageClient
 from utils.logger import setup_logger
-from utils.data_storage import StockDataStorage
+from utils.data_storage import StockDataStorage, SNAPSHOT_DTYPES
 import sys
+import os
+import json
+import hashlib
+import functools
 import argparse
-from utils.config import load_config
-import yfinance as yf
+from utils.config import load_config, get_env_mtime
+from utils.kernels import aggregate_prices
 
 # Set up logger
 logger = setup_logger('StockMonitor')
 
-def validate_symbol(symbol: str, api_key: str = None) -> bool:
-    """Validate a stock symbol using Yahoo Finance"""
+# Seconds between scheduled updates, and before retrying a failed one
+UPDATE_INTERVAL = 300
+RETRY_INTERVAL = 60
+
+# Refresh requests within this many seconds of the last update are coalesced
+REFRESH_DEBOUNCE = 5
+
+# How long a symbol's validation result is trusted before it is re-checked
+SYMBOL_VALIDATION_TTL = 24 * 60 * 60
+
+@functools.lru_cache(maxsize=1)
+def _read_validation_cache(cache_file: str, mtime_ns: int) -> dict:
+    """Read the symbol validation cache file, memoized on its modification time"""
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_symbol_validation(symbols, cache_file: str) -> dict:
+    """
+    Load cached symbol validation results
+    
+    Args:
+        symbols: List of configured stock symbols
+        cache_file: Path of the validation cache file
+        
+    Returns:
+        dict: Mapping of symbol to validity for every symbol with a fresh cache entry
+    """
     try:
-        logger.info(f"Validating symbol: {symbol}")
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        if info and 'regularMarketPrice' in info:
-            logger.info(f"Symbol {symbol} validated through Yahoo Finance")
-            return True
-        return False
+        if not os.path.exists(cache_file):
+            return {}
+        cache = _read_validation_cache(cache_file, os.stat(cache_file).st_mtime_ns)
+        entries = cache.get(_symbols_key(symbols), {})
+        now = time.time()
+        return {
+            symbol: valid
+            for symbol, (valid, expiry_ts) in entries.items()
+            if symbol in symbols and expiry_ts > now
+        }
+    except Exception as e:
+        logger.error(f"Error loading symbol validation cache: {str(e)}")
+        return {}
+
+def save_symbol_validation(symbols, validation: dict, cache_file: str):
+    """
+    Persist symbol validation results
+    
+    Args:
+        symbols: List of configured stock symbols
+        validation: Mapping of symbol to validity to record
+        cache_file: Path of the validation cache file
+    """
+    try:
+        cache = {}
+        if os.path.exists(cache_file):
+            cache = dict(_read_validation_cache(cache_file, os.stat(cache_file).st_mtime_ns))
+        key = _symbols_key(symbols)
+        expiry_ts = time.time() + SYMBOL_VALIDATION_TTL
+        entries = dict(cache.get(key, {}))
+        entries.update({symbol: (valid, expiry_ts) for symbol, valid in validation.items()})
+        cache[key] = entries
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
     except Exception as e:
-        logger.error(f"Error validating symbol {symbol}: {str(e)}")
-        return False
+        logger.error(f"Error saving symbol validation cache: {str(e)}")
+
+def _symbols_key(symbols) -> str:
+    return hashlib.sha1(','.join(sorted(symbols)).encode('utf-8')).hexdigest()
 
 def get_stock_data(symbol: str, api_key: str = None) -> pd.DataFrame:
     """Get stock data from Yahoo Finance"""
     try:
         logger.info(f"Fetching data for {symbol} from Yahoo Finance")
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        quote = YahooFinanceClient().get_stock_data(symbol)
         
-        if not info or 'regularMarketPrice' not in info:
+        if not quote or quote['price'] is None or quote['prev_close'] is None:
             logger.error(f"No data available for {symbol}")
             return None
             
-        data = pd.DataFrame([{
+        daily_change = calculate_daily_change(quote['price'], quote['prev_close'])
+        data = _results_frame([{
             'Symbol': symbol,
-            'Company': info.get('longName', 'Unknown'),
-            'Current Price': f"${info['regularMarketPrice']:.2f}",
-            'Previous Close': f"${info['previousClose']:.2f}",
-            'Daily Change': f"{info['regularMarketChangePercent']:.2f}%",
+            'Company': quote['company_name'],
+            'Current Price': float(quote['price']),
+            'Previous Close': float(quote['prev_close']),
+            'Daily Change': daily_change,
             'Sources': 'Yahoo Finance'
         }])
         
@@ -61,25 +123,25 @@ def calculate_average_price(data_sources):
         data_sources: List of dictionaries containing stock data from different sources
     """
     try:
-        prices = []
-        prev_closes = []
-        
-        for data in data_sources:
-            if data and data['price']:
-                prices.append(data['price'])
-            if data and data['prev_close']:
-                prev_closes.append(data['prev_close'])
+        prices = np.fromiter(
+            (data['price'] for data in data_sources if data and data['price']),
+            dtype=np.float64
+        )
+        prev_closes = np.fromiter(
+            (data['prev_close'] for data in data_sources if data and data['prev_close']),
+            dtype=np.float64
+        )
         
-        if not prices:
+        if not prices.size:
             logger.warning("No valid prices found in any data source")
             return None, None
             
-        if not prev_closes:
+        if not prev_closes.size:
             logger.warning("No valid previous close prices found in any data source")
             return None, None
         
-        avg_price = sum(prices) / len(prices)
-        avg_prev_close = sum(prev_closes) / len(prev_closes)
+        avg_price = float(prices.mean())
+        avg_prev_close = float(prev_closes.mean())
         
         logger.debug(f"Calculated average price: {avg_price}, previous close: {avg_prev_close}")
         return avg_price, avg_prev_close
@@ -107,12 +169,137 @@ def calculate_daily_change(current_price, prev_close):
         logger.error(f"Error calculating daily change: {str(e)}")
         return None
 
-def get_stock_status(symbols, alpha_vantage_key):
+def _results_frame(results) -> pd.DataFrame:
+    """Build the stock status DataFrame from result rows"""
+    return pd.DataFrame(results).astype(SNAPSHOT_DTYPES)
+
+def _build_stock_status(symbols, symbol_sources):
     """
-    Get current status of specified stock symbols from multiple sources
+    Aggregate the per-source data fetched for each symbol into result rows
+    
+    Prices from every symbol and source are stacked into arrays and averaged
+    by a single aggregate_prices call rather than one Python call per symbol.
+    
+    Args:
+        symbols: List of stock symbols
+        symbol_sources: For each symbol, a list of (client, data) pairs,
+            data being None when the source failed
+    """
+    n_sources = max((len(sources) for sources in symbol_sources), default=0)
+    prices = np.full((len(symbols), n_sources), np.nan)
+    prev_closes = np.full((len(symbols), n_sources), np.nan)
+    
+    rows = []
+    aggregated = []
+    for i, (symbol, sources) in enumerate(zip(symbols, symbol_sources)):
+        try:
+            source_names = []
+            # Sources are in priority order, so the first known name wins
+            # (Yahoo Finance over Alpha Vantage)
+            company_name = 'N/A'
+            for j, (client, data) in enumerate(sources):
+                if data:
+                    source_names.append(client.get_source_name())
+                    if company_name == 'N/A':
+                        company_name = data['company_name']
+                    if data['price']:
+                        prices[i, j] = data['price']
+                    if data['prev_close']:
+                        prev_closes[i, j] = data['prev_close']
+            
+            if not source_names:
+                logger.warning(f"No data sources available for {symbol}")
+                rows.append({
+                    'Symbol': symbol,
+                    'Company': 'N/A',
+                    'Current Price': None,
+                    'Previous Close': None,
+                    'Daily Change': None,
+                    'Sources': 'N/A'
+                })
+                continue
+            
+            aggregated.append(len(rows))
+            rows.append({
+                'Symbol': symbol,
+                'Company': company_name,
+                'Current Price': None,
+                'Previous Close': None,
+                'Daily Change': None,
+                'Sources': ' + '.join(source_names) if source_names else 'N/A'
+            })
+            
+        except Exception as e:
+            logger.error(f"Error processing {symbol}: {str(e)}")
+            prices[i] = np.nan
+            prev_closes[i] = np.nan
+            rows.append({
+                'Symbol': symbol,
+                'Company': 'Error',
+                'Current Price': None,
+                'Previous Close': None,
+                'Daily Change': None,
+                'Sources': 'Error'
+            })
+    
+    # Calculate average prices and daily changes for all symbols at once
+    avg_price, avg_prev_close, daily_change = aggregate_prices(prices, prev_closes)
+    
+    for i in aggregated:
+        row = rows[i]
+        if np.isnan(avg_price[i]):
+            logger.warning(f"No valid prices found for {row['Symbol']}")
+        row['Current Price'] = avg_price[i]
+        row['Previous Close'] = avg_prev_close[i]
+        row['Daily Change'] = daily_change[i]
+        logger.info(f"Successfully processed {row['Symbol']}")
+    
+    return rows
+
+async def _fetch_stock_status(symbols, yahoo_client, alpha_vantage_client, concurrency: int):
     """
-    results = []
+    Fetch and aggregate data for all symbols concurrently
+    
+    Yahoo Finance quotes for every symbol are fetched with a single batch
+    request while the per-symbol Alpha Vantage requests are in flight.
+    
+    Args:
+        symbols: List of stock symbols
+        yahoo_client: Yahoo Finance client
+        alpha_vantage_client: Alpha Vantage client or None
+        concurrency: Maximum number of Alpha Vantage requests in flight
+    """
+    # Alpha Vantage has a strict free-tier quota, so bound its requests
+    alpha_vantage_slots = asyncio.Semaphore(concurrency)
+    
+    async def fetch_alpha_vantage(symbol):
+        async with alpha_vantage_slots:
+            return await alpha_vantage_client.get_stock_data_async(symbol)
     
+    try:
+        yahoo_batch = asyncio.ensure_future(yahoo_client.get_stock_data_batch_async(symbols))
+        if alpha_vantage_client:
+            alpha_vantage_data = await asyncio.gather(*[fetch_alpha_vantage(symbol) for symbol in symbols])
+        else:
+            alpha_vantage_data = [None] * len(symbols)
+        yahoo_data = await yahoo_batch
+        
+        return _build_stock_status(symbols, [
+            [(yahoo_client, yahoo_data.get(symbol)), (alpha_vantage_client, alpha_vantage_quote)]
+            for symbol, alpha_vantage_quote in zip(symbols, alpha_vantage_data)
+        ])
+    finally:
+        await yahoo_client.aclose()
+        if alpha_vantage_client:
+            await alpha_vantage_client.aclose()
+
+async def get_stock_status_async(symbols, alpha_vantage_key, concurrency: int = 5):
+    """
+    Get current status of specified stock symbols from multiple sources
+    
+    Symbols are fetched concurrently; concurrency bounds the number of
+    Alpha Vantage requests in flight to respect its API rate limits.
+    """
     try:
         # Initialize clients
         yahoo_client = YahooFinanceClient()
@@ -122,94 +309,178 @@ def get_stock_status(symbols, alpha_vantage_key):
             logger.error("Failed to initialize Yahoo Finance client")
             return pd.DataFrame()
             
-        for symbol in symbols:
-            try:
-                logger.info(f"Processing stock: {symbol}")
-                # Get data from all available sources
-                data_sources = []
-                source_names = []
-                
-                # Get Yahoo Finance data
-                yahoo_data = yahoo_client.get_stock_data(symbol)
-                if yahoo_data:
-                    data_sources.append(yahoo_data)
-                    source_names.append(yahoo_client.get_source_name())
-                
-                # Get Alpha Vantage data if available
-                if alpha_vantage_client:
-                    alpha_vantage_data = alpha_vantage_client.get_stock_data(symbol)
-                    if alpha_vantage_data:
-                        data_sources.append(alpha_vantage_data)
-                        source_names.append(alpha_vantage_client.get_source_name())
-                
-                if not data_sources:
-                    logger.warning(f"No data sources available for {symbol}")
-                    results.append({
-                        'Symbol': symbol,
-                        'Company': 'N/A',
-                        'Current Price': 'N/A',
-                        'Previous Close': 'N/A',
-                        'Daily Change': 'N/A',
-                        'Sources': 'N/A'
-                    })
-                    continue
-                
-                # Calculate average prices
-                avg_price, avg_prev_close = calculate_average_price(data_sources)
-                
-                # Calculate daily change
-                daily_change = calculate_daily_change(avg_price, avg_prev_close)
-                
-                # Get company name (prefer Yahoo Finance name if available)
-                company_name = next(
-                    (data['company_name'] for data in data_sources if data['company_name'] != 'N/A'),
-                    'N/A'
-                )
-                
-                results.append({
-                    'Symbol': symbol,
-                    'Company': company_name,
-                    'Current Price': f"${avg_price:.2f}" if avg_price else 'N/A',
-                    'Previous Close': f"${avg_prev_close:.2f}" if avg_prev_close else 'N/A',
-                    'Daily Change': f"{daily_change:.2f}%" if daily_change is not None else 'N/A',
-                    'Sources': ' + '.join(source_names) if source_names else 'N/A'
-                })
-                
-                logger.info(f"Successfully processed {symbol}")
-                
-                # Add delay to respect API rate limits
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error processing {symbol}: {str(e)}")
-                results.append({
-                    'Symbol': symbol,
-                    'Company': 'Error',
-                    'Current Price': 'N/A',
-                    'Previous Close': 'N/A',
-                    'Daily Change': f"Error: {str(e)}",
-                    'Sources': 'Error'
-                })
+        results = await _fetch_stock_status(symbols, yahoo_client, alpha_vantage_client, concurrency)
         
         if not results:
             logger.error("No results were generated for any symbols")
             return pd.DataFrame()
             
-        return pd.DataFrame(results)
+        return _results_frame(results)
         
     except Exception as e:
         logger.error(f"Critical error in get_stock_status: {str(e)}")
         return pd.DataFrame()
 
-def main(one_time: bool = False):
-    """Main function to run the stock monitor"""
+def _process_one(symbol, alpha_vantage_client, alpha_vantage_slots):
+    """
+    Fetch the Alpha Vantage quote for a symbol
+    
+    Args:
+        symbol: Stock symbol
+        alpha_vantage_client: Alpha Vantage client or None
+        alpha_vantage_slots: Semaphore bounding concurrent Alpha Vantage requests
+    """
+    logger.info(f"Processing stock: {symbol}")
+    if not alpha_vantage_client:
+        return None
+    with alpha_vantage_slots:
+        return alpha_vantage_client.get_stock_data(symbol)
+
+def get_stock_status_threaded(symbols, alpha_vantage_key, concurrency: int = 5):
+    """
+    Get current status of specified stock symbols using a thread pool
+    
+    Alternative to get_stock_status_async for callers that cannot run an
+    event loop; the per-symbol requests overlap in worker threads.
+    """
+    try:
+        if not symbols:
+            logger.error("No results were generated for any symbols")
+            return pd.DataFrame()
+        
+        # Initialize clients
+        yahoo_client = YahooFinanceClient()
+        alpha_vantage_client = AlphaVantageClient(alpha_vantage_key) if alpha_vantage_key else None
+        alpha_vantage_slots = threading.Semaphore(concurrency)
+        
+        yahoo_data = yahoo_client.get_stock_data_batch(symbols)
+        
+        alpha_vantage_data = {}
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+            futures = {
+                executor.submit(_process_one, symbol, alpha_vantage_client, alpha_vantage_slots): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                alpha_vantage_data[futures[future]] = future.result()
+        
+        return _results_frame(_build_stock_status(symbols, [
+            [(yahoo_client, yahoo_data.get(symbol)), (alpha_vantage_client, alpha_vantage_data[symbol])]
+            for symbol in symbols
+        ]))
+        
+    except Exception as e:
+        logger.error(f"Critical error in get_stock_status: {str(e)}")
+        return pd.DataFrame()
+
+def get_stock_status(symbols, alpha_vantage_key, concurrency: int = 5, use_threads: bool = False):
+    """
+    Synchronous entry point for fetching the status of stock symbols
+    
+    Runs get_stock_status_async on a fresh event loop, or
+    get_stock_status_threaded when use_threads is set.
+    """
+    if use_threads:
+        return get_stock_status_threaded(symbols, alpha_vantage_key, concurrency)
+    return asyncio.run(get_stock_status_async(symbols, alpha_vantage_key, concurrency))
+
+class RefreshTrigger:
+    """
+    Thread-safe handle used to request an immediate refresh from the monitor loop
+    
+    The monitor loop binds the trigger to its event loop on start-up; any
+    thread (e.g. the Streamlit app) can then call set() to wake it up.
+    """
+    
+    def __init__(self):
+        self._loop = None
+        self._event = None
+        self._lock = threading.Lock()
+    
+    def bind(self):
+        """
+        Bind the trigger to the running event loop
+        
+        Raises:
+            RuntimeError: If another running monitor loop already owns the trigger
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            owner = self._loop
+            if owner is not None and owner is not loop and owner.is_running():
+                raise RuntimeError("Refresh trigger is already bound to a running monitor loop")
+            self._loop = loop
+            self._event = asyncio.Event()
+    
+    def unbind(self):
+        """Detach the trigger, unless it is owned by another event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        with self._lock:
+            if self._loop is not loop:
+                return
+            self._loop = None
+            self._event = None
+    
+    def set(self) -> bool:
+        """
+        Request a refresh
+        
+        Returns:
+            bool: False if no monitor loop is running to serve the request
+        """
+        loop, event = self._loop, self._event
+        if loop is None or loop.is_closed():
+            return False
+        loop.call_soon_threadsafe(event.set)
+        return True
+    
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until a refresh is requested or the timeout expires
+        
+        Returns:
+            bool: True if a refresh was requested
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+# Module-level trigger shared with the Streamlit app
+refresh_event = RefreshTrigger()
+
+async def _wait_for_next_refresh(last_refresh: float, interval: float):
+    """
+    Sleep until the next scheduled refresh, waking early on refresh requests
+    
+    Requests arriving within REFRESH_DEBOUNCE seconds of the last refresh are
+    coalesced into it rather than triggering another fetch.
+    """
+    while True:
+        remaining = interval - (time.monotonic() - last_refresh)
+        if remaining <= 0:
+            return
+        if await refresh_event.wait(remaining):
+            if time.monotonic() - last_refresh >= REFRESH_DEBOUNCE:
+                logger.info("Refresh requested")
+                return
+            logger.info("Refresh requested right after the last update, skipping")
+
+async def main_async(one_time: bool = False, use_threads: bool = False):
+    """Main coroutine running the stock monitor"""
     try:
         logger.info("Starting Stock Monitor")
         
         # Load configuration
-        config = load_config()
+        config = load_config(get_env_mtime())
         symbols = config.get('symbols', [])
-        api_key = config.get('alpha_vantage_api_key')
+        api_key = config.get('alpha_vantage_key')
         
         if not symbols:
             logger.error("No stock symbols configured")
@@ -220,71 +491,97 @@ def main(one_time: bool = False):
         if not api_key:
             logger.warning("Alpha Vantage API key not configured. Only using Yahoo Finance data.")
         
-        # Validate symbols
-        valid_symbols = []
-        for symbol in symbols:
-            if validate_symbol(symbol, api_key):
-                valid_symbols.append(symbol)
-                
-        logger.info(f"Found {len(valid_symbols)} valid symbols out of {len(symbols)}")
-        
-        if not valid_symbols:
-            logger.error("No valid symbols found")
-            return
-            
-        logger.info(f"Monitoring {len(valid_symbols)} valid stocks: {', '.join(valid_symbols)}")
-        
         # Initialize data storage
-        data_storage = StockDataStorage()
-        
-        while True:
-            try:
-                # Get latest data for comparison
-                previous_data = data_storage.get_latest_data()
+        with StockDataStorage() as data_storage:
+            
+            # Skip symbols already known to be invalid; the rest are validated
+            # by the quote fetch below, a symbol being invalid only when neither
+            # Yahoo Finance nor Alpha Vantage produce a price for it
+            validation_cache = os.path.join(data_storage.base_dir, 'symbol_validation.json')
+            validation = load_symbol_validation(symbols, validation_cache)
+            valid_symbols = [symbol for symbol in symbols if validation.get(symbol, True)]
+            
+            if not valid_symbols:
+                logger.error("No valid symbols found")
+                return
                 
-                # Process each stock
-                for symbol in valid_symbols:
-                    logger.info(f"Processing stock: {symbol}")
-                    stock_data = get_stock_data(symbol, api_key)
-                    
-                    if stock_data is not None:
-                        logger.info(f"Successfully processed {symbol}")
+            logger.info(f"Monitoring {len(valid_symbols)} stocks: {', '.join(valid_symbols)}")
+            
+            # Latest stored data for comparison; kept in memory after each save
+            previous_data = data_storage.get_latest_data()
+            
+            # One-time runs never wait, so they leave the trigger to the
+            # background loop
+            if not one_time:
+                refresh_event.bind()
+            while True:
+                last_refresh = time.monotonic()
+                try:
+                    # Fetch all stocks in one pass
+                    if use_threads:
+                        current_data = await asyncio.to_thread(
+                            get_stock_status_threaded, valid_symbols, api_key
+                        )
                     else:
-                        logger.error(f"Failed to process {symbol}")
-                
-                # Save current data
-                current_data = data_storage.get_latest_data()
-                if current_data is not None:
-                    data_storage.save_stock_data(current_data)
+                        current_data = await get_stock_status_async(valid_symbols, api_key)
+                    if not current_data.empty:
+                        # Only keep symbols that produced a price
+                        current_data = current_data.dropna(subset=['Current Price'])
+                        
+                        # Record validation for symbols checked for the first time
+                        fetched = set(current_data['Symbol'])
+                        unchecked = [symbol for symbol in valid_symbols if symbol not in validation]
+                        if unchecked and fetched:
+                            checked = {symbol: symbol in fetched for symbol in unchecked}
+                            validation.update(checked)
+                            save_symbol_validation(symbols, checked, validation_cache)
+                            valid_symbols = [symbol for symbol in valid_symbols if validation[symbol]]
+                            logger.info(f"Found {len(valid_symbols)} valid symbols out of {len(symbols)}")
                     
-                    # Compare with previous data
-                    if previous_data is not None:
-                        comparison_data = data_storage.compare_with_previous(current_data)
+                    if not current_data.empty:
+                        # Compare with previous data before it is superseded
+                        comparison_data = None
+                        if previous_data is not None and not previous_data.empty:
+                            comparison_data = data_storage.compare_with_previous(current_data, previous_data)
+                        
+                        # Save current data
+                        data_storage.save_stock_data(current_data)
+                        previous_data = current_data
+                        
                         if comparison_data is not None:
                             # Generate and print report
                             report = data_storage.generate_report(comparison_data)
                             print("\n" + report)
-                
-                if one_time:
-                    logger.info("One-time run completed, exiting")
-                    break
+                    else:
+                        logger.error("Failed to fetch data for any symbol")
+                    
+                    if one_time:
+                        logger.info("One-time run completed, exiting")
+                        break
+                        
+                    # Wait before next update
+                    await _wait_for_next_refresh(last_refresh, UPDATE_INTERVAL)
+                    
+                except Exception as e:
+                    logger.error(f"Error in main loop: {str(e)}")
+                    if one_time:
+                        break
+                    await _wait_for_next_refresh(time.monotonic(), RETRY_INTERVAL)
                     
-                # Wait before next update
-                time.sleep(300)  # 5 minutes
-                
-            except Exception as e:
-                logger.error(f"Error in main loop: {str(e)}")
-                if one_time:
-                    break
-                time.sleep(60)  # Wait 1 minute before retrying
-                
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
         raise
+    finally:
+        refresh_event.unbind()
+
+def main(one_time: bool = False, use_threads: bool = False):
+    """Main function to run the stock monitor"""
+    asyncio.run(main_async(one_time, use_threads))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Stock Market Monitor')
     parser.add_argument('--one-time', action='store_true', help='Run once and exit')
+    parser.add_argument('--threads', action='store_true', help='Fetch symbols with a thread pool instead of asyncio')
     args = parser.parse_args()
     
-    main(one_time=args.one_time)
\ No newline at end of file
+    main(one_time=args.one_time, use_threads=args.threads)
\ No newline at end of file
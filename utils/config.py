@@ -1,26 +1,51 @@
 import os
-from dotenv import load_dotenv
+import functools
+from dotenv import dotenv_values
 from utils.logger import setup_logger
 
 logger = setup_logger('Config')
 
-def load_config():
+ENV_FILE = '.env'
+
+def get_env_mtime(env_file: str = ENV_FILE) -> int:
+    """
+    Get the modification time of the .env file
+    
+    Returns:
+        int: Modification time in nanoseconds, or 0 if the file does not exist
+    """
+    try:
+        return os.stat(env_file).st_mtime_ns
+    except OSError:
+        return 0
+
+@functools.lru_cache(maxsize=1)
+def load_config(env_mtime: int = 0):
     """
     Load configuration from .env file and config.yaml
     
+    The result is cached for the lifetime of the process and only reloaded
+    when called with a different env_mtime.
+    
+    Args:
+        env_mtime (int): Modification time of the .env file, see get_env_mtime
+    
     Returns:
         dict: Configuration dictionary containing symbols and API keys
     """
     try:
-        load_dotenv()
+        # Read the file on every reload instead of loading it into
+        # os.environ, which would keep the first values it saw. Variables
+        # set in the real environment still take precedence.
+        env = {**dotenv_values(ENV_FILE), **os.environ}
         
         # Load stock symbols from environment variable
-        symbols_str = os.getenv('STOCK_SYMBOLS', '')
+        symbols_str = env.get('STOCK_SYMBOLS') or ''
         if not symbols_str:
             logger.error("No stock symbols found in .env file. Please configure STOCK_SYMBOLS.")
             return {'symbols': [], 'alpha_vantage_key': None}
         
-        symbols = [symbol.strip() for symbol in symbols_str.split(',')]
+        symbols = tuple(symbol.strip() for symbol in symbols_str.split(','))
         if not symbols:
             logger.error("No valid stock symbols found in STOCK_SYMBOLS configuration.")
             return {'symbols': [], 'alpha_vantage_key': None}
@@ -28,7 +53,7 @@ def load_config():
         logger.info(f"Loaded {len(symbols)} stock symbols from config")
 
         # Load Alpha Vantage API key
-        alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY', '')
+        alpha_vantage_key = env.get('ALPHA_VANTAGE_API_KEY') or ''
         if not alpha_vantage_key or alpha_vantage_key == 'your_api_key_here':
             logger.warning("Alpha Vantage API key not configured. Only using Yahoo Finance data.")
             alpha_vantage_key = None
@@ -1,31 +1,245 @@
+import numpy as np
 import pandas as pd
 import os
-from datetime import datetime
+import re
+import time
+import atexit
+import weakref
+from datetime import datetime, timedelta
 import duckdb
 from utils.logger import setup_logger
 
 logger = setup_logger('DataStorage')
 
+# Storages with a connection still open. Held weakly so an instance that is
+# never closed can still be collected; the rest are flushed at exit.
+_open_storages = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_storages():
+    for storage in list(_open_storages):
+        storage.flush()
+
+# Column types of stock snapshot DataFrames. Prices stay numeric and are only
+# formatted for display; symbols and sources repeat, so they are categorical.
+SNAPSHOT_DTYPES = {
+    'Symbol': 'category',
+    'Current Price': 'float64',
+    'Previous Close': 'float64',
+    'Daily Change': 'float64',
+    'Sources': 'category'
+}
+
+# Bumped whenever the tables or views change, see _upgrade_schema
+SCHEMA_VERSION = 2
+
+DAILY_SUMMARY_VIEW = """
+    SELECT 
+        CAST(timestamp AS DATE) as date,
+        symbol,
+        company,
+        arg_min(current_price, timestamp) as opening_price,
+        arg_max(current_price, timestamp) as closing_price,
+        MAX(current_price) as high_price,
+        MIN(current_price) as low_price,
+        AVG(current_price) as average_price,
+        arg_min(daily_change, timestamp) as opening_change,
+        arg_max(daily_change, timestamp) as closing_change,
+        any_value(sources) as sources
+    FROM stock_snapshots
+    GROUP BY date, symbol, company
+"""
+
+# Column order of the stock_snapshots table, used when appending rows
+SNAPSHOT_COLUMNS = [
+    'timestamp', 'symbol', 'company', 'current_price',
+    'previous_close', 'daily_change', 'sources'
+]
+
+LATEST_DATA_QUERY = """
+    SELECT 
+        timestamp,
+        symbol as "Symbol",
+        company as "Company",
+        current_price as "Current Price",
+        previous_close as "Previous Close",
+        daily_change as "Daily Change",
+        sources as "Sources"
+    FROM stock_snapshots
+    WHERE timestamp = ?
+"""
+
+# Joins the registered current rows ("cur") onto the snapshot saved at the
+# bound timestamp. As in compare_with_previous, the comparison columns are
+# only filled when all four prices and changes are known.
+COMPARE_QUERY = """
+    WITH joined AS (
+        SELECT 
+            c.*,
+            p.current_price as prev_price,
+            p.daily_change as prev_daily_change,
+            c."Current Price" IS NOT NULL AND c."Daily Change" IS NOT NULL
+                AND p.current_price IS NOT NULL AND p.daily_change IS NOT NULL as comparable
+        FROM cur c
+        LEFT JOIN (
+            SELECT symbol, current_price, daily_change
+            FROM stock_snapshots
+            WHERE timestamp = ?
+        ) p ON c."Symbol" = p.symbol
+    )
+    SELECT 
+        * EXCLUDE (prev_price, prev_daily_change, comparable),
+        CASE WHEN comparable THEN prev_price END as "Previous Price",
+        CASE WHEN comparable THEN "Current Price" - prev_price END as "Price Change",
+        CASE WHEN comparable THEN prev_daily_change END as "Previous Daily Change",
+        CASE WHEN comparable THEN "Daily Change" - prev_daily_change END as "Change in Daily Change"
+    FROM joined
+    ORDER BY "Symbol"
+"""
+
+DAILY_SUMMARY_TEMPLATE = """
+    SELECT 
+        symbol as "Symbol",
+        company as "Company",
+        arg_min(current_price, timestamp) as "Opening Price",
+        arg_max(current_price, timestamp) as "Closing Price",
+        MAX(current_price) as "High Price",
+        MIN(current_price) as "Low Price",
+        AVG(current_price) as "Average Price",
+        arg_min(daily_change, timestamp) as "Opening Change",
+        arg_max(daily_change, timestamp) as "Closing Change",
+        any_value(sources) as "Sources"
+    FROM stock_snapshots
+    WHERE timestamp >= ? AND timestamp < ?{symbol_filter}
+    GROUP BY symbol, company
+"""
+DAILY_SUMMARY_QUERY = DAILY_SUMMARY_TEMPLATE.format(symbol_filter='')
+DAILY_SUMMARY_SYMBOL_QUERY = DAILY_SUMMARY_TEMPLATE.format(symbol_filter=' AND symbol = ?')
+
+# Report layout. Changes are printed with an explicit sign and arrow.
+REPORT_SUMMARY = (
+    "\nSummary:\n"
+    "Total Symbols Analyzed: {total_symbols}\n"
+    "Significant Changes Detected: {significant_changes}\n"
+    "Positive Changes: {positive_changes}\n"
+    "Negative Changes: {negative_changes}"
+)
+PRICE_CHANGE_LINE = (
+    "{arrow} {symbol} ({company}): "
+    "${previous_price:.2f} → ${current_price:.2f} ({change_pct:+.2f}%)"
+)
+DAILY_CHANGE_LINE = (
+    "{arrow} {symbol} ({company}): "
+    "Daily Change: {previous_daily_change:.2f}% → {current_daily_change:.2f}% "
+    "(Change: {change_diff:+.2f}%)"
+)
+REPORT_ARROWS = {'increase': '↑', 'decrease': '↓'}
+
+DAILY_SUMMARY_PRICES = ['Opening Price', 'Closing Price', 'High Price', 'Low Price', 'Average Price']
+DAILY_SUMMARY_CHANGES = ['Opening Change', 'Closing Change']
+
+# Currency and percentage decoration stripped from numbers given as strings
+NUMBER_DECORATION = re.compile(r'[$%,]')
+
+def _to_float_frame(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """
+    Convert price and percentage columns to float64
+    
+    Numeric columns are only cast. Columns holding strings such as "$1,234.50"
+    or "5.2%" are cleaned together in a single regex replacement.
+    
+    Args:
+        df (pd.DataFrame): Frame holding the columns
+        columns (list): Names of the columns to convert
+        
+    Returns:
+        pd.DataFrame: float64 frame with the given columns, NaN where a value
+            could not be parsed
+    """
+    values = df[columns]
+    text_columns = [column for column in columns if not pd.api.types.is_numeric_dtype(values[column])]
+    if not text_columns:
+        return values.astype('float64')
+        
+    values = values.copy()
+    values[text_columns] = values[text_columns].astype(str).replace(
+        NUMBER_DECORATION, '', regex=True
+    ).apply(pd.to_numeric, errors='coerce')
+    return values.astype('float64')
+
+def _to_float(values: pd.Series) -> pd.Series:
+    """Convert a price or percentage column to float64, parsing '$', '%' and ',' out of strings"""
+    return _to_float_frame(values.to_frame(), [values.name])[values.name]
+
+def _as_duckdb_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Snapshot frame with prices DuckDB can compare numerically
+    
+    DuckDB scans numeric, categorical and string columns in place, so only
+    price columns still holding strings are parsed to float64. The frame is
+    returned as is when there is nothing to convert.
+    """
+    text_columns = [
+        column for column in ('Current Price', 'Previous Close', 'Daily Change')
+        if column in df and not pd.api.types.is_numeric_dtype(df[column])
+    ]
+    if not text_columns:
+        return df
+    return df.assign(**_to_float_frame(df, text_columns))
+
 class StockDataStorage:
-    def __init__(self, base_dir='data', price_change_threshold=5.0):
+    """
+    Stock snapshots stored in DuckDB, with comparison and alert helpers
+    
+    stock_snapshots has no PRIMARY KEY. DuckDB keeps a key's ART index up to
+    date on every insert, which slows ingest a lot, and all reads filter by
+    timestamp range or symbol, which row-group zonemaps already serve. In
+    exchange, uniqueness of (timestamp, symbol) is only enforced by flush(),
+    which skips rows already stored. Rows written to the table any other way
+    are not checked.
+    """
+    __slots__ = (
+        'base_dir', 'price_change_threshold', 'batch_size', 'flush_interval', 'db_path', 'conn',
+        '_buffer', '_buffer_rows', '_last_flush',
+        '_latest_data', '_latest_data_mtime', '_last_ts', '_last_ts_mtime', '__weakref__'
+    )
+    
+    def __init__(self, base_dir='data', price_change_threshold=5.0, batch_size=1, flush_interval=None):
         """
         Initialize the data storage with DuckDB database
         
         Args:
             base_dir (str): Base directory for storing database files
             price_change_threshold (float): Percentage threshold for significant price changes
+            batch_size (int): Number of buffered snapshot rows that triggers a write.
+                The default of 1 writes every snapshot as soon as it is saved.
+            flush_interval (float, optional): Seconds after which buffered rows are
+                written even if batch_size has not been reached
         """
         self.base_dir = base_dir
         self.price_change_threshold = price_change_threshold
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Snapshot rows saved but not yet written, appended in one transaction by flush()
+        self._buffer = []
+        self._buffer_rows = 0
+        self._last_flush = time.monotonic()
         self._ensure_directory_exists()
         self.db_path = os.path.join(base_dir, 'stock_data.db')
+        # Latest snapshot as last read, reused while the database files are unchanged
+        self._latest_data = None
+        self._latest_data_mtime = None
+        # Timestamp of the latest snapshot, so reads need not scan for MAX(timestamp)
+        self._last_ts = None
+        self._last_ts_mtime = None
         self._initialize_database()
+        _open_storages.add(self)
         
     def _ensure_directory_exists(self):
         """Ensure the data directory exists"""
         if not os.path.exists(self.base_dir):
             os.makedirs(self.base_dir)
-            logger.info(f"Created data directory: {self.base_dir}")
+            logger.info("Created data directory: %s", self.base_dir)
             
     def _initialize_database(self):
         """Initialize DuckDB database and create necessary tables"""
@@ -38,51 +252,90 @@ class StockDataStorage:
                     timestamp TIMESTAMP,
                     symbol VARCHAR,
                     company VARCHAR,
-                    current_price DECIMAL(10,2),
-                    previous_close DECIMAL(10,2),
-                    daily_change DECIMAL(5,2),
-                    sources VARCHAR,
-                    PRIMARY KEY (timestamp, symbol)
+                    current_price DOUBLE,
+                    previous_close DOUBLE,
+                    daily_change DOUBLE,
+                    sources VARCHAR
                 )
             """)
             
-            # Create daily summary view
-            self.conn.execute("""
-                CREATE OR REPLACE VIEW daily_summary AS
-                WITH ranked_data AS (
-                    SELECT 
-                        CAST(timestamp AS DATE) as date,
-                        symbol,
-                        company,
-                        current_price,
-                        daily_change,
-                        sources,
-                        ROW_NUMBER() OVER (PARTITION BY CAST(timestamp AS DATE), symbol ORDER BY timestamp) as rn_asc,
-                        ROW_NUMBER() OVER (PARTITION BY CAST(timestamp AS DATE), symbol ORDER BY timestamp DESC) as rn_desc
-                    FROM stock_snapshots
-                )
-                SELECT 
-                    date,
-                    symbol,
-                    company,
-                    MAX(CASE WHEN rn_asc = 1 THEN current_price END) as opening_price,
-                    MAX(CASE WHEN rn_desc = 1 THEN current_price END) as closing_price,
-                    MAX(current_price) as high_price,
-                    MIN(current_price) as low_price,
-                    AVG(current_price) as average_price,
-                    MAX(CASE WHEN rn_asc = 1 THEN daily_change END) as opening_change,
-                    MAX(CASE WHEN rn_desc = 1 THEN daily_change END) as closing_change,
-                    sources
-                FROM ranked_data
-                GROUP BY date, symbol, company, sources
-            """)
+            # The schema version is kept in a table since DuckDB has no
+            # user_version pragma; views and migrations only need to run
+            # when it is behind
+            self.conn.execute("CREATE TABLE IF NOT EXISTS schema_info (version INTEGER)")
+            version = self.conn.execute("SELECT MAX(version) FROM schema_info").fetchone()[0] or 0
+            if version < SCHEMA_VERSION:
+                self._upgrade_schema(version)
             
             logger.info("Initialized DuckDB database and created tables")
             
-        except Exception as e:
-            logger.error(f"Error initializing database: {str(e)}")
+        except Exception:
+            logger.exception("Error initializing database")
             raise
             
+    def _upgrade_schema(self, version: int):
+        """
+        Bring a database created by an older version up to SCHEMA_VERSION
+        
+        Args:
+            version (int): Schema version recorded in the database, 0 if none
+        """
+        # DuckDB schema changes are transactional, so a failed or interrupted
+        # upgrade leaves the previous schema and version in place
+        self.conn.begin()
+        try:
+            self._migrate_decimal_columns()
+            if version < 2:
+                self._drop_primary_key()
+            
+            # Create daily summary view. arg_min/arg_max pick the opening and
+            # closing values in the same pass as the other aggregates, so no
+            # per-partition sort is needed.
+            self.conn.execute(f"CREATE OR REPLACE VIEW daily_summary AS {DAILY_SUMMARY_VIEW}")
+            
+            self.conn.execute("DELETE FROM schema_info")
+            self.conn.execute("INSERT INTO schema_info VALUES (?)", [SCHEMA_VERSION])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        logger.info("Upgraded database schema from version %d to %d", version, SCHEMA_VERSION)
+        
+    def _drop_primary_key(self):
+        """Rebuild stock_snapshots without the PRIMARY KEY of older databases"""
+        has_primary_key = self.conn.execute("""
+            SELECT COUNT(*)
+            FROM duckdb_constraints()
+            WHERE table_name = 'stock_snapshots' AND constraint_type = 'PRIMARY KEY'
+        """).fetchone()[0]
+        if not has_primary_key:
+            return
+        # DuckDB cannot drop a constraint in place, so the table is copied
+        self.conn.execute("DROP VIEW IF EXISTS daily_summary")
+        self.conn.execute("CREATE TABLE stock_snapshots_new AS SELECT * FROM stock_snapshots ORDER BY timestamp")
+        self.conn.execute("DROP TABLE stock_snapshots")
+        self.conn.execute("ALTER TABLE stock_snapshots_new RENAME TO stock_snapshots")
+        logger.info("Dropped the primary key of stock_snapshots")
+        
+    def _migrate_decimal_columns(self):
+        """Convert price columns of databases created with DECIMAL types to DOUBLE"""
+        decimal_columns = self.conn.execute("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_name = 'stock_snapshots'
+                AND column_name IN ('current_price', 'previous_close', 'daily_change')
+                AND data_type LIKE 'DECIMAL%'
+        """).fetchall()
+        for (column,) in decimal_columns:
+            self.conn.execute(f"ALTER TABLE stock_snapshots ALTER {column} TYPE DOUBLE")
+            logger.info("Migrated stock_snapshots.%s to DOUBLE", column)
+            
+    @property
+    def latest_mtime(self) -> int:
+        """Most recent modification time (ns) of the database file or its WAL"""
+        paths = [self.db_path, f"{self.db_path}.wal"]
+        return max((os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)), default=0)
+        
     def save_stock_data(self, df: pd.DataFrame, timestamp: datetime = None):
         """
         Save stock data to DuckDB database
@@ -95,184 +348,279 @@ class StockDataStorage:
             if timestamp is None:
                 timestamp = datetime.now()
                 
-            # Prepare data for insertion
-            df['timestamp'] = timestamp
-            df['current_price'] = df['Current Price'].str.replace('$', '').astype(float)
-            df['previous_close'] = df['Previous Close'].str.replace('$', '').astype(float)
-            df['daily_change'] = df['Daily Change'].str.replace('%', '').astype(float)
-            
-            # Insert data into database
-            self.conn.execute("""
-                INSERT INTO stock_snapshots 
-                (timestamp, symbol, company, current_price, previous_close, daily_change, sources)
-                SELECT 
-                    timestamp,
-                    "Symbol",
-                    "Company",
-                    current_price,
-                    previous_close,
-                    daily_change,
-                    "Sources"
-                FROM df
-            """)
-            
-            logger.info(f"Saved stock data for timestamp {timestamp}")
-            
-        except Exception as e:
-            logger.error(f"Error saving stock data: {str(e)}")
+            # Build the rows in table column order; flush() hands them to
+            # DuckDB's appender, skipping SQL parsing and planning
+            numbers = _to_float_frame(df, ['Current Price', 'Previous Close', 'Daily Change'])
+            rows = pd.DataFrame({
+                'timestamp': pd.Series(timestamp, index=df.index, dtype='datetime64[us]'),
+                'symbol': df['Symbol'].astype(object),
+                'company': df['Company'],
+                'current_price': numbers['Current Price'],
+                'previous_close': numbers['Previous Close'],
+                'daily_change': numbers['Daily Change'],
+                'sources': df['Sources'].astype(object)
+            }, columns=SNAPSHOT_COLUMNS)
+            self._buffer.append(rows)
+            self._buffer_rows += len(rows)
+            logger.info("Saved stock data for timestamp %s", timestamp)
+            
+            interval_elapsed = (
+                self.flush_interval is not None
+                and time.monotonic() - self._last_flush >= self.flush_interval
+            )
+            if self._buffer_rows >= self.batch_size or interval_elapsed:
+                self.flush()
+            
+        except Exception:
+            logger.exception("Error saving stock data")
+            
+    def flush(self):
+        """
+        Write buffered snapshot rows to the database in a single transaction
+        
+        If the write fails the rows stay buffered and are retried by the next flush.
+        """
+        if not self._buffer:
+            return
+        rows = pd.concat(self._buffer, ignore_index=True) if len(self._buffer) > 1 else self._buffer[0]
+        self._last_flush = time.monotonic()
+        try:
+            # There is no primary key, so rows already stored for the same
+            # timestamp and symbol are skipped here. Only the batch's own
+            # timestamp range is looked up, which zonemaps keep cheap.
+            rows = rows.drop_duplicates(['timestamp', 'symbol'], keep='last')
+            first_ts = rows['timestamp'].min().to_pydatetime()
+            last_ts = rows['timestamp'].max().to_pydatetime()
+            
+            # Unchanged files mean no other writer committed since the latest
+            # timestamp was last known, so it can be advanced without a lookup
+            mtime = self.latest_mtime
+            self.conn.begin()
+            existing = self.conn.execute(
+                "SELECT timestamp, symbol FROM stock_snapshots WHERE timestamp BETWEEN ? AND ?",
+                [first_ts, last_ts]
+            ).df()
+            if not existing.empty:
+                existing['timestamp'] = existing['timestamp'].astype(rows['timestamp'].dtype)
+                keys = pd.MultiIndex.from_frame(rows[['timestamp', 'symbol']])
+                duplicates = keys.isin(pd.MultiIndex.from_frame(existing))
+                if duplicates.any():
+                    logger.warning("Skipping %d snapshot rows already stored", int(duplicates.sum()))
+                    rows = rows[~duplicates]
+            self.conn.append('stock_snapshots', rows)
+            self.conn.commit()
+            
+            # Only drop the buffered rows once they are stored
+            self._buffer = []
+            self._buffer_rows = 0
+            self._latest_data = None
+            # Rows saved with an older explicit timestamp are not the latest,
+            # so keep whichever is newer. If another writer touched the files
+            # the known value is stale and the next read looks it up instead.
+            if self._last_ts_mtime == mtime:
+                self._last_ts = last_ts if self._last_ts is None else max(self._last_ts, last_ts)
+                self._last_ts_mtime = self.latest_mtime
+            logger.info("Wrote %d snapshot rows to database", len(rows))
+            
+        except Exception:
+            logger.exception("Error writing stock data, keeping %d rows for the next flush", self._buffer_rows)
+            try:
+                self.conn.rollback()
+            except duckdb.Error:
+                # The transaction was never started
+                pass
+            
+    def _get_last_timestamp(self, mtime: int):
+        """
+        Timestamp of the most recent snapshot
+        
+        The value looked up after the last read or flush is reused while the
+        database files are unchanged; otherwise another writer may have saved,
+        so it is looked up again. The mtime is taken before the lookup, so a
+        write racing with it still invalidates the value.
+        
+        Args:
+            mtime (int): Current latest_mtime of the database files
             
-    def get_latest_data(self):
+        Returns:
+            datetime: Latest snapshot timestamp, or None if there is no data
+        """
+        if self._last_ts is None or self._last_ts_mtime != mtime:
+            self._last_ts = self.conn.execute(
+                "SELECT MAX(timestamp) FROM stock_snapshots"
+            ).fetchone()[0]
+            self._last_ts_mtime = mtime
+        return self._last_ts
+        
+    def get_latest_data(self, symbol: str = None):
         """
         Get the most recent stock data from the database
         
+        The unfiltered result is reused until the database files are modified.
+        
+        Args:
+            symbol (str, optional): Only return this symbol's row. The filter is
+                applied inside DuckDB so other symbols are never materialized.
+        
         Returns:
             pd.DataFrame: DataFrame containing the latest stock data
         """
         try:
-            query = """
-                WITH latest_timestamp AS (
-                    SELECT MAX(timestamp) as max_ts
-                    FROM stock_snapshots
-                )
-                SELECT 
-                    timestamp,
-                    symbol as "Symbol",
-                    company as "Company",
-                    CONCAT('$', current_price) as "Current Price",
-                    CONCAT('$', previous_close) as "Previous Close",
-                    CONCAT(daily_change, '%') as "Daily Change",
-                    sources as "Sources"
-                FROM stock_snapshots
-                WHERE timestamp = (SELECT max_ts FROM latest_timestamp)
-            """
-            
-            df = self.conn.execute(query).df()
-            logger.info("Retrieved latest data from database")
-            return df
+            self.flush()
+            mtime = self.latest_mtime
+            if symbol is None and self._latest_data is not None and self._latest_data_mtime == mtime:
+                return self._latest_data.copy()
+                
+            query = LATEST_DATA_QUERY
+            params = [self._get_last_timestamp(mtime)]
+            if symbol is not None:
+                query += " AND symbol = ?"
+                params.append(symbol)
             
-        except Exception as e:
-            logger.error(f"Error retrieving latest data: {str(e)}")
+            df = self.conn.execute(query, params).df().astype(SNAPSHOT_DTYPES)
+            logger.info("Retrieved latest data from database")
+            if symbol is not None:
+                return df
+            self._latest_data = df
+            self._latest_data_mtime = mtime
+            return df.copy()
+            
+        except Exception:
+            logger.exception("Error retrieving latest data")
             return None
             
-    def get_daily_summary(self, date: datetime = None):
+    def get_daily_summary(self, date: datetime = None, symbol: str = None, formatted: bool = False):
         """
         Get the daily summary for a specific date
         
         Args:
             date (datetime, optional): Date to get summary for. Defaults to current date.
+            symbol (str, optional): Only summarize this symbol, filtered inside DuckDB.
+            formatted (bool): Return prices as "$" strings and changes as "%" strings
+                for display instead of floats.
             
         Returns:
             pd.DataFrame: DataFrame containing the daily summary
         """
         try:
+            self.flush()
             if date is None:
                 date = datetime.now()
                 
-            query = """
-                SELECT 
-                    symbol as "Symbol",
-                    company as "Company",
-                    CONCAT('$', opening_price) as "Opening Price",
-                    CONCAT('$', closing_price) as "Closing Price",
-                    CONCAT('$', high_price) as "High Price",
-                    CONCAT('$', low_price) as "Low Price",
-                    CONCAT('$', average_price) as "Average Price",
-                    CONCAT(opening_change, '%') as "Opening Change",
-                    CONCAT(closing_change, '%') as "Closing Change",
-                    sources as "Sources"
-                FROM daily_summary
-                WHERE date = ?
-            """
-            
-            df = self.conn.execute(query, [date.date()]).df()
-            logger.info(f"Retrieved daily summary for {date.date()}")
+            # Aggregate straight from stock_snapshots over the day's timestamp
+            # range, so DuckDB can skip row groups outside it by their min/max
+            day_start = datetime(date.year, date.month, date.day)
+            params = [day_start, day_start + timedelta(days=1)]
+            if symbol is None:
+                query = DAILY_SUMMARY_QUERY
+            else:
+                query = DAILY_SUMMARY_SYMBOL_QUERY
+                params.append(symbol)
+            
+            df = self.conn.execute(query, params).df()
+            if formatted:
+                df = self.format_daily_summary(df)
+            logger.info("Retrieved daily summary for %s", date.date())
             return df
             
-        except Exception as e:
-            logger.error(f"Error retrieving daily summary: {str(e)}")
+        except Exception:
+            logger.exception("Error retrieving daily summary")
             return None
             
-    def compare_with_previous(self, current_df: pd.DataFrame):
+    @staticmethod
+    def format_daily_summary(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Format a daily summary for display
+        
+        Args:
+            df (pd.DataFrame): Daily summary as returned by get_daily_summary
+            
+        Returns:
+            pd.DataFrame: Copy with prices as "$" strings and changes as "%" strings
+        """
+        df = df.copy()
+        for column in DAILY_SUMMARY_PRICES:
+            df[column] = np.char.mod('$%.2f', df[column].to_numpy(dtype='float64'))
+        for column in DAILY_SUMMARY_CHANGES:
+            df[column] = np.char.mod('%.2f%%', df[column].to_numpy(dtype='float64'))
+        return df
+            
+    def compare_with_previous(self, current_df: pd.DataFrame, previous_df: pd.DataFrame = None):
         """
         Compare current data with the most recent saved data
         
         Args:
             current_df (pd.DataFrame): Current stock data to compare
+            previous_df (pd.DataFrame, optional): Previous data already held by the caller.
+                Defaults to the latest data in the database.
             
         Returns:
             pd.DataFrame: DataFrame with comparison results
         """
         try:
-            # Get the previous data
-            previous_df = self.get_latest_data()
+            # Without previous data from the caller, join against the latest
+            # stored snapshot inside DuckDB
             if previous_df is None:
-                logger.info("No previous data found for comparison")
-                return None
+                return self.arrow_compare(current_df).to_pandas()
                 
-            # Create a copy of current data for comparison
-            comparison_df = current_df.copy()
+            # Previous values keyed by symbol, joined onto the current rows
+            previous = pd.DataFrame({
+                'Symbol': previous_df['Symbol'].astype(str).to_numpy(),
+                'prev_price': _to_float(previous_df['Current Price']).to_numpy(),
+                'prev_daily_change': _to_float(previous_df['Daily Change']).to_numpy()
+            }).drop_duplicates('Symbol')
+            merged = pd.DataFrame({
+                'Symbol': current_df['Symbol'].astype(str).to_numpy()
+            }).merge(previous, on='Symbol', how='left')
+            
+            prev_price = merged['prev_price'].to_numpy()
+            prev_daily_change = merged['prev_daily_change'].to_numpy()
+            current_price = _to_float(current_df['Current Price']).to_numpy()
+            current_daily_change = _to_float(current_df['Daily Change']).to_numpy()
+            
+            # Only compare symbols where all four values are known
+            comparable = ~np.isnan(prev_price) & ~np.isnan(prev_daily_change) \
+                & ~np.isnan(current_price) & ~np.isnan(current_daily_change)
             
-            # Add comparison columns
-            comparison_df['Previous Price'] = None
-            comparison_df['Price Change'] = None
-            comparison_df['Previous Daily Change'] = None
-            comparison_df['Change in Daily Change'] = None
-            
-            # Helper function to safely convert price strings to float
-            def safe_price_convert(price_str):
-                if isinstance(price_str, float):
-                    return price_str
-                if isinstance(price_str, str):
-                    return float(price_str.replace('$', '').replace(',', ''))
-                return None
-                
-            # Helper function to safely convert percentage strings to float
-            def safe_percent_convert(percent_str):
-                if isinstance(percent_str, float):
-                    return percent_str
-                if isinstance(percent_str, str):
-                    return float(percent_str.replace('%', '').replace(',', ''))
-                return None
-            
-            # Compare each symbol
-            for idx, row in comparison_df.iterrows():
-                symbol = row['Symbol']
-                prev_row = previous_df[previous_df['Symbol'] == symbol]
-                
-                if not prev_row.empty:
-                    try:
-                        # Get previous values and convert safely
-                        prev_price = safe_price_convert(prev_row['Current Price'].iloc[0])
-                        prev_daily_change = safe_percent_convert(prev_row['Daily Change'].iloc[0])
-                        
-                        # Get current values and convert safely
-                        current_price = safe_price_convert(row['Current Price'])
-                        current_daily_change = safe_percent_convert(row['Daily Change'])
-                        
-                        if all(v is not None for v in [prev_price, current_price, prev_daily_change, current_daily_change]):
-                            # Calculate changes
-                            price_change = current_price - prev_price
-                            daily_change_diff = current_daily_change - prev_daily_change
-                            
-                            # Update comparison columns
-                            comparison_df.at[idx, 'Previous Price'] = f"${prev_price:.2f}"
-                            comparison_df.at[idx, 'Price Change'] = f"${price_change:.2f}"
-                            comparison_df.at[idx, 'Previous Daily Change'] = f"{prev_daily_change:.2f}%"
-                            comparison_df.at[idx, 'Change in Daily Change'] = f"{daily_change_diff:.2f}%"
-                        else:
-                            logger.warning(f"Could not convert values for {symbol}, skipping comparison")
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing comparison for {symbol}: {str(e)}")
-                        continue
+            comparison_df = current_df.copy()
+            comparison_df['Previous Price'] = np.where(comparable, prev_price, np.nan)
+            comparison_df['Price Change'] = np.where(comparable, current_price - prev_price, np.nan)
+            comparison_df['Previous Daily Change'] = np.where(comparable, prev_daily_change, np.nan)
+            comparison_df['Change in Daily Change'] = np.where(
+                comparable, current_daily_change - prev_daily_change, np.nan
+            )
                     
             logger.info("Successfully compared current data with previous data")
             return comparison_df
             
-        except Exception as e:
-            logger.error(f"Error comparing data: {str(e)}")
+        except Exception:
+            logger.exception("Error comparing data")
             return None
             
+    def arrow_compare(self, current):
+        """
+        Compare current data with the latest saved snapshot inside DuckDB
+        
+        The current rows are joined against the stored snapshot by symbol in a
+        single query, without materializing the previous data in pandas.
+        
+        Args:
+            current (pd.DataFrame or pyarrow.Table): Current stock data to compare
+            
+        Returns:
+            pyarrow.Table: Current data with the comparison columns added, in
+                the layout returned by compare_with_previous
+        """
+        self.flush()
+        last_ts = self._get_last_timestamp(self.latest_mtime)
+        if isinstance(current, pd.DataFrame):
+            current = _as_duckdb_frame(current)
+        self.conn.register('cur', current)
+        try:
+            return self.conn.execute(COMPARE_QUERY, [last_ts]).to_arrow_table()
+        finally:
+            self.conn.unregister('cur')
+            
     def analyze_price_changes(self, comparison_df: pd.DataFrame):
         """
         Analyze price changes and generate alerts for significant movements
@@ -284,64 +632,55 @@ class StockDataStorage:
             dict: Dictionary containing alerts and analysis results
         """
         try:
+            threshold = self.price_change_threshold
+            
+            # Significant price changes, computed over whole columns
+            priced = comparison_df.dropna(subset=['Previous Price', 'Current Price'])
+            current_price = priced['Current Price'].to_numpy(dtype='float64')
+            previous_price = priced['Previous Price'].to_numpy(dtype='float64')
+            price_change_pct = (current_price - previous_price) / previous_price * 100
+            significant = np.abs(price_change_pct) >= threshold
+            increased = price_change_pct > 0
+            
+            significant_changes = pd.DataFrame({
+                'symbol': priced['Symbol'].astype(str).to_numpy()[significant],
+                'company': priced['Company'].to_numpy()[significant],
+                'current_price': current_price[significant],
+                'previous_price': previous_price[significant],
+                'change_pct': price_change_pct[significant],
+                'direction': np.where(increased[significant], 'increase', 'decrease')
+            })
+            
+            # Significant changes in the daily change
+            changed = comparison_df.dropna(subset=['Change in Daily Change'])
+            daily_change_diff = changed['Change in Daily Change'].to_numpy(dtype='float64')
+            daily_significant = np.abs(daily_change_diff) >= threshold
+            
+            daily_change_alerts = pd.DataFrame({
+                'symbol': changed['Symbol'].astype(str).to_numpy()[daily_significant],
+                'company': changed['Company'].to_numpy()[daily_significant],
+                'current_daily_change': changed['Daily Change'].to_numpy(dtype='float64')[daily_significant],
+                'previous_daily_change': changed['Previous Daily Change'].to_numpy(dtype='float64')[daily_significant],
+                'change_diff': daily_change_diff[daily_significant],
+                'direction': np.where(daily_change_diff[daily_significant] > 0, 'increase', 'decrease')
+            })
+            
             alerts = {
-                'significant_changes': [],
-                'daily_change_alerts': [],
+                'significant_changes': significant_changes.to_dict('records'),
+                'daily_change_alerts': daily_change_alerts.to_dict('records'),
                 'summary': {
                     'total_symbols': len(comparison_df),
-                    'significant_changes': 0,
-                    'positive_changes': 0,
-                    'negative_changes': 0
+                    'significant_changes': int(significant.sum()),
+                    'positive_changes': int((significant & increased).sum()),
+                    'negative_changes': int((significant & ~increased).sum())
                 }
             }
             
-            for _, row in comparison_df.iterrows():
-                symbol = row['Symbol']
-                
-                # Skip if no previous data
-                if pd.isna(row['Previous Price']) or pd.isna(row['Current Price']):
-                    continue
-                    
-                # Convert price strings to float
-                current_price = float(row['Current Price'].replace('$', ''))
-                previous_price = float(row['Previous Price'].replace('$', ''))
-                
-                # Calculate price change percentage
-                price_change_pct = ((current_price - previous_price) / previous_price) * 100
-                
-                # Check for significant price changes
-                if abs(price_change_pct) >= self.price_change_threshold:
-                    alerts['significant_changes'].append({
-                        'symbol': symbol,
-                        'company': row['Company'],
-                        'current_price': current_price,
-                        'previous_price': previous_price,
-                        'change_pct': price_change_pct,
-                        'direction': 'increase' if price_change_pct > 0 else 'decrease'
-                    })
-                    alerts['summary']['significant_changes'] += 1
-                    if price_change_pct > 0:
-                        alerts['summary']['positive_changes'] += 1
-                    else:
-                        alerts['summary']['negative_changes'] += 1
-                
-                # Check for significant daily change changes
-                if pd.notna(row['Change in Daily Change']):
-                    daily_change_diff = float(row['Change in Daily Change'].replace('%', ''))
-                    if abs(daily_change_diff) >= self.price_change_threshold:
-                        alerts['daily_change_alerts'].append({
-                            'symbol': symbol,
-                            'company': row['Company'],
-                            'current_daily_change': float(row['Daily Change'].replace('%', '')),
-                            'previous_daily_change': float(row['Previous Daily Change'].replace('%', '')),
-                            'change_diff': daily_change_diff
-                        })
-            
-            logger.info(f"Analyzed price changes for {alerts['summary']['total_symbols']} symbols")
+            logger.info("Analyzed price changes for %d symbols", alerts['summary']['total_symbols'])
             return alerts
             
-        except Exception as e:
-            logger.error(f"Error analyzing price changes: {str(e)}")
+        except Exception:
+            logger.exception("Error analyzing price changes")
             return None
             
     def generate_report(self, comparison_df: pd.DataFrame):
@@ -359,53 +698,51 @@ class StockDataStorage:
             if not alerts:
                 return "No significant changes detected."
                 
-            report = []
-            report.append("\nPrice Movement Analysis Report")
-            report.append("=" * 50)
+            report = [
+                "\nPrice Movement Analysis Report",
+                "=" * 50
+            ]
             
             # Add summary
-            report.append("\nSummary:")
-            report.append(f"Total Symbols Analyzed: {alerts['summary']['total_symbols']}")
-            report.append(f"Significant Changes Detected: {alerts['summary']['significant_changes']}")
-            report.append(f"Positive Changes: {alerts['summary']['positive_changes']}")
-            report.append(f"Negative Changes: {alerts['summary']['negative_changes']}")
+            report.append(REPORT_SUMMARY.format_map(alerts['summary']))
             
             # Add significant price changes
             if alerts['significant_changes']:
                 report.append("\nSignificant Price Changes:")
                 report.append("-" * 50)
-                for change in alerts['significant_changes']:
-                    direction = "↑" if change['direction'] == 'increase' else "↓"
-                    report.append(
-                        f"{direction} {change['symbol']} ({change['company']}): "
-                        f"${change['previous_price']:.2f} → ${change['current_price']:.2f} "
-                        f"({change['change_pct']:.2f}%)"
-                    )
+                report.extend(
+                    PRICE_CHANGE_LINE.format_map({**change, 'arrow': REPORT_ARROWS[change['direction']]})
+                    for change in alerts['significant_changes']
+                )
             
             # Add daily change alerts
             if alerts['daily_change_alerts']:
                 report.append("\nSignificant Daily Change Changes:")
                 report.append("-" * 50)
-                for alert in alerts['daily_change_alerts']:
-                    direction = "↑" if alert['change_diff'] > 0 else "↓"
-                    report.append(
-                        f"{direction} {alert['symbol']} ({alert['company']}): "
-                        f"Daily Change: {alert['previous_daily_change']:.2f}% → "
-                        f"{alert['current_daily_change']:.2f}% "
-                        f"(Change: {alert['change_diff']:.2f}%)"
-                    )
+                report.extend(
+                    DAILY_CHANGE_LINE.format_map({**alert, 'arrow': REPORT_ARROWS[alert['direction']]})
+                    for alert in alerts['daily_change_alerts']
+                )
             
             return "\n".join(report)
             
-        except Exception as e:
-            logger.error(f"Error generating report: {str(e)}")
+        except Exception:
+            logger.exception("Error generating report")
             return "Error generating report."
             
-    def __del__(self):
-        """Close the database connection when the object is destroyed"""
+    def close(self):
+        """Write any buffered rows and close the database connection"""
         try:
             if hasattr(self, 'conn'):
+                self.flush()
                 self.conn.close()
+                _open_storages.discard(self)
                 logger.info("Closed database connection")
-        except Exception as e:
-            logger.error(f"Error closing database connection: {str(e)}") 
\ No newline at end of file
+        except Exception:
+            logger.exception("Error closing database connection")
+            
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _aggregate_prices_numpy(prices: np.ndarray, prev_closes: np.ndarray):
+    """NumPy implementation of aggregate_prices, used when numba is unavailable"""
+    valid = ~np.isnan(prices).all(axis=1) & ~np.isnan(prev_closes).all(axis=1)
+    avg_price = np.full(prices.shape[0], np.nan)
+    avg_prev_close = np.full(prices.shape[0], np.nan)
+    avg_price[valid] = np.nanmean(prices[valid], axis=1)
+    avg_prev_close[valid] = np.nanmean(prev_closes[valid], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_pct = np.where(
+            avg_prev_close != 0,
+            (avg_price - avg_prev_close) / avg_prev_close * 100,
+            np.nan
+        )
+    return avg_price, avg_prev_close, change_pct
+
+def _aggregate_prices_loop(prices, prev_closes):
+    n_symbols, n_sources = prices.shape
+    avg_price = np.full(n_symbols, np.nan)
+    avg_prev_close = np.full(n_symbols, np.nan)
+    change_pct = np.full(n_symbols, np.nan)
+    for i in range(n_symbols):
+        price_sum = 0.0
+        price_count = 0
+        prev_sum = 0.0
+        prev_count = 0
+        for j in range(n_sources):
+            if not np.isnan(prices[i, j]):
+                price_sum += prices[i, j]
+                price_count += 1
+            if not np.isnan(prev_closes[i, j]):
+                prev_sum += prev_closes[i, j]
+                prev_count += 1
+        if price_count == 0 or prev_count == 0:
+            continue
+        avg_price[i] = price_sum / price_count
+        avg_prev_close[i] = prev_sum / prev_count
+        if avg_prev_close[i] != 0:
+            change_pct[i] = (avg_price[i] - avg_prev_close[i]) / avg_prev_close[i] * 100
+    return avg_price, avg_prev_close, change_pct
+
+if njit is not None:
+    # NaN marks a missing source, so the fast-math flags assuming no NaN/inf are left out
+    _aggregate_prices_jit = njit(
+        cache=True,
+        fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+    )(_aggregate_prices_loop)
+else:
+    _aggregate_prices_jit = None
+
+def aggregate_prices(prices: np.ndarray, prev_closes: np.ndarray):
+    """
+    Average prices across data sources and compute the daily change in one pass
+
+    Args:
+        prices: float64 array of shape (n_symbols, n_sources), NaN where a source has no price
+        prev_closes: float64 array of the same shape holding previous closing prices
+
+    Returns:
+        tuple: (avg_price, avg_prev_close, change_pct) float64 arrays of length n_symbols.
+            All three are NaN for a symbol lacking either a price or a previous close,
+            and change_pct is also NaN when the previous close is zero.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    prev_closes = np.ascontiguousarray(prev_closes, dtype=np.float64)
+    if _aggregate_prices_jit is not None:
+        return _aggregate_prices_jit(prices, prev_closes)
+    return _aggregate_prices_numpy(prices, prev_closes)
\ No newline at end of file
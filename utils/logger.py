@@ -1,64 +1,103 @@
+import atexit
 import logging
 import os
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+LOG_DIR = 'logs'
+
+# Records from every logger go through one queue; a single background
+# listener formats and writes them so logging calls never block on file I/O
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+class _PerLoggerFileHandler(logging.Handler):
+    """Write each logger's records to its own file, rotated at midnight"""
+    
+    def __init__(self, log_dir: str):
+        super().__init__()
+        self.log_dir = log_dir
+        self._handlers = {}
+    
+    def emit(self, record: logging.LogRecord):
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            handler = TimedRotatingFileHandler(
+                os.path.join(self.log_dir, f'{record.name}.log'),
+                when='midnight',
+                encoding='utf-8'
+            )
+            handler.setFormatter(self.formatter)
+            self._handlers[record.name] = handler
+        handler.handle(record)
+    
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
+def _start_listener():
+    """Start the process-wide listener writing queued records to file and console"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        
+        # Create logs directory if it doesn't exist
+        if not os.path.exists(LOG_DIR):
+            os.makedirs(LOG_DIR)
+        
+        # Create file handler (one file per logger, rotated daily)
+        file_handler = _PerLoggerFileHandler(LOG_DIR)
+        file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+        
+        # Create console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(logging.Formatter(
+            '%(levelname)s: %(message)s'
+        ))
+        
+        _listener = QueueListener(_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        # Drain the queue before the interpreter exits
+        atexit.register(_listener.stop)
 
 def setup_logger(name: str) -> logging.Logger:
     """
-    Set up a logger with both file and console handlers
+    Set up a logger writing to both file and console through the shared queue
     
     Args:
         name: Name of the logger
-        
+    
     Returns:
         Configured logger instance
     """
-    # Create logs directory if it doesn't exist
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
     # Create logger
     logger = logging.getLogger(name)
     
+    # Loggers are set up once; clients call this for every instance
+    if getattr(logger, '_sm_configured', False):
+        return logger
+    
+    _start_listener()
+    
     # Clear any existing handlers
     logger.handlers = []
     
     # Set log level
     logger.setLevel(logging.INFO)
     
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_formatter = logging.Formatter(
-        '%(levelname)s: %(message)s'
-    )
-    
-    # Create file handler (with rotation)
-    log_file = os.path.join(
-        log_dir,
-        f'{name}_{datetime.now().strftime("%Y%m%d")}.log'
-    )
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(file_formatter)
-    
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Hand records to the listener instead of writing them here
+    logger.addHandler(QueueHandler(_queue))
     
     # Prevent propagation to root logger
     logger.propagate = False
     
-    return logger 
\ No newline at end of file
+    logger._sm_configured = True
+    return logger
\ No newline at end of file